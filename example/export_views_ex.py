@@ -0,0 +1,39 @@
+"""
+example of the use of export_views to save the steps of a fixed_zoom as images.
+"""
+import sys
+sys.path.append('..')
+
+from util import export_views , create_gradual_scale
+
+import numpy as np
+
+#the seed is fixed so that every process creates the same data
+np.random.seed(0)
+data = np.random.standard_cauchy((2,10000))*100
+
+#function called in each process to create the graph, must be defined at the top level of the module
+def figure_factory () :
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.scatter(data[0] , data[1])
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_title('example export_views')
+    return fig , ax
+
+
+#the processes import this module, so the export must only run in the main process
+if __name__ == '__main__' :
+    zoom_scale = create_gradual_scale( 
+        x = data[0] ,
+        y = data[1] ,
+        fixed_point = ( np.median(data[0]) , np.median(data[1]) ) ,
+        factor = 2 , 
+        nb_element = 15
+    )
+
+    for filename in export_views( figure_factory , zoom_scale , filename = 'zoom_%02d.png' , processes = 4 ) :
+        print(filename)
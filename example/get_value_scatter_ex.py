@@ -0,0 +1,39 @@
+"""
+example of the use of get_value_scatter.
+"""
+import sys
+sys.path.append('..')
+
+from util import get_value_scatter , grab_move , mouse_zoom
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+fig , ax = plt.subplots()
+
+#create a big scatter plot with the number of each point as metadata
+nb_points = 1000000
+x = np.random.standard_normal(nb_points)
+y = np.random.standard_normal(nb_points)
+metadata = [ 'point %d'%i for i in range(nb_points) ]
+
+ax.scatter(x , y , s = 1)
+ax.set_xlabel('x')
+ax.set_ylabel('y')
+ax.set_title('example')
+
+#add and activate the events
+zoom_event=mouse_zoom(scale = 2 , bound = True  ,ax=ax,fig=fig)
+zoom_event.activate()
+grab_event = grab_move (ax=ax,fig=fig)
+grab_event.activate()
+value_event = get_value_scatter(x = x , y = y , 
+    metadata = metadata ,
+    max_distance = 20 ,
+    colors = "#ff0000",
+    ax=ax,
+    fig=fig)
+value_event.activate()
+
+
+plt.show()
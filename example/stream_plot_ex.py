@@ -0,0 +1,46 @@
+"""
+example of the use of stream_plot with get_value, mouse_zoom and grab_move.
+"""
+import sys
+sys.path.append('..')
+
+from util import stream_plot , get_value , grab_move , mouse_zoom
+
+import threading
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+fig , ax = plt.subplots()
+ax.set_xlabel('time')
+ax.set_ylabel('value')
+ax.set_title('example')
+
+#keep the last 5000 samples of 2 curves and follow the last 10 seconds
+stream_event = stream_plot(nb_curves = 2 , capacity = 5000 , interval = 50 , window = 10 , ax = ax , fig = fig)
+stream_event.activate()
+
+#add and activate the events, mouse_zoom must not be bounded since the limits change with the stream
+zoom_event=mouse_zoom(scale = 2 , bound = False  ,ax=ax,fig=fig)
+zoom_event.activate()
+grab_event = grab_move (ax=ax,fig=fig)
+grab_event.activate()
+value_event = get_value(data = stream_event.data , 
+    name_curves = ['sin' , 'noise'] , 
+    colors = "#0000ff",
+    ax=ax,
+    fig=fig)
+value_event.activate()
+
+#thread simulating the telemetry
+def produce () :
+    begin = time.monotonic()
+    while True :
+        t = time.monotonic() - begin
+        stream_event.push( (t , np.sin(t)) , curve = 0 )
+        stream_event.push( (t , np.random.standard_normal() * 0.1) , curve = 1 )
+        time.sleep(0.005)
+
+threading.Thread(target = produce , daemon = True).start()
+
+plt.show()
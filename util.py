@@ -2,9 +2,37 @@
 List of matplotlib's event handler functions.
 """
 
-from matplotlib import pyplot as plt
-from matplotlib.backend_bases import MouseButton
-from matplotlib.widgets import CheckButtons , Button
+import os
+import re
+import threading
+import time
+from collections import deque , OrderedDict
+
+import numpy as np
+import matplotlib
+from matplotlib.backend_bases import MouseButton , DrawEvent
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import Collection , LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+from matplotlib.widgets import CheckButtons , Button , TextBox
+
+#pyplot is imported only when needed so that the handlers can be used on figures embedded in an application
+#without loading pyplot and its backend. Every handler only works on and redraws its own figure.
+
+def get_ax_fig ( ax = None , fig = None ) :
+    """
+    return (ax , fig) where the one not given is found from the other.
+    Only use the current axis and figure of pyplot if neither is given.
+    """
+    if ax is None :
+        if fig is None :
+            from matplotlib import pyplot as plt
+            fig = plt.gcf()
+        ax = fig.gca()
+    fig = ax.figure if fig is None else fig
+    return ax , fig
 
 def expand_figure ( side , added_inch , ax =  None , fig = None ) :
     """
@@ -18,8 +46,7 @@ def expand_figure ( side , added_inch , ax =  None , fig = None ) :
     """
 
     # if fig or ax is unkown, get it
-    ax = plt.gca() if ax is None else ax
-    fig = plt.gcf() if fig is None else fig
+    ax , fig = get_ax_fig(ax , fig)
 
     assert side in ['LEFT' , 'RIGHT' , 'BOTTOM' , 'TOP']
 
@@ -49,12 +76,12 @@ def expand_figure ( side , added_inch , ax =  None , fig = None ) :
 
     #change the axis postition so that it keeps the same size as before the figure expansion.
     if is_vertical :
-        plt.subplots_adjust(
+        fig.subplots_adjust(
             bottom =  new_pos[0] ,
             top  =  new_pos[1]
             )      
     else :
-        plt.subplots_adjust(
+        fig.subplots_adjust(
             left=  new_pos[0] ,
             right =  new_pos[1]
             )
@@ -68,8 +95,19 @@ class event_handler :
         """
         set the axis and figure. Find it if not given
         """
-        self.ax = plt.gca() if ax is None else ax
-        self.fig = plt.gcf() if fig is None else fig
+        self.ax , self.fig = get_ax_fig(ax , fig)
+        #number of redraw asked by the handler, used to measure how often the figure is redrawn
+        self.nb_redraw = 0
+
+    def redraw (self , now = False) :
+        """
+        redraw only the figure of the handler, when the GUI is idle or immediately if now is True.
+        """
+        self.nb_redraw += 1
+        if now :
+            self.fig.canvas.draw()
+        else :
+            self.fig.canvas.draw_idle()
 
     def activate(self) :
         """
@@ -97,7 +135,8 @@ class event_handler :
         create the function if currently interact with axis == ax then do action. Used for activate_on_ax.
         """
         def action_on (event) :
-            if event.inaxes == ax :
+            #events that are not linked to an axis (draw, resize ...) are always used
+            if getattr(event , 'inaxes' , ax) == ax :
                 action(event)
         return action_on
     
@@ -147,42 +186,76 @@ class grab_move (event_handler)  :
                 self.ax.set_xlim (xlim[0] + diff[0] , xlim[1] + diff[0] )
                 self.ax.set_ylim (ylim[0] + diff[1] , ylim[1] + diff[1] )
                 
-                plt.draw()
+                self.redraw()
 
 def create_gradual_scale ( x ,y , fixed_point , 
-    factor = 2 , nb_element = 15) :
+    factor = 2 , nb_element = 15 , density = False , sample_size = 1000000 , chunk_size = 1000000) :
     """
     consider x and y as data for a graph, create a list of limit where for each step, the distance between each limit and the fixed_point
     is divided by factor; and where the first step is the regular limit given if you just plot the data.
     Used for easy values for fixed_zoom.
 
-    x ,y : data along the x and y axis.
-    fixed_point :central point that is considered to be zoomed on.
+    x ,y : data along the x and y axis. Can be lists, numpy arrays or memory-mapped arrays, they are read by chunks. nan values are ignored.
+    fixed_point :central point that is considered to be zoomed on. Can also be a list of points of shape (k,2).
     factor : by what to divide between each step
     nb_element : how many step to create.
+    density : if True, instead of dividing the distance, each step divides by factor the number of points between each limit and the fixed_point.
+        The steps are then closer where there is a lot of data. The number of points is estimated with the quantiles of a sample of the data.
+    sample_size : maximal number of points of the sample used when density is True.
+    chunk_size : number of elements of x and y read at once.
 
-    return the steps with format : [x0,y0,x1,y1]
+    return the steps as an array of shape (nb_element,4) with format : [x0,y0,x1,y1] ; or of shape (k,nb_element,4) if there are k fixed points.
     """
+    x , y = np.asarray(x) , np.asarray(y)
+    points = np.asarray(fixed_point , dtype=float)
+    fixed = np.atleast_2d(points)[:,None,:]
+
+    #get the bounds in one pass over the data
+    mins , maxs = np.full(2 , np.inf) , np.full(2 , -np.inf)
+    for i in range(0 , len(x) , chunk_size) :
+        for dim , d in enumerate((x[i:i+chunk_size] , y[i:i+chunk_size])) :
+            #fmin and fmax ignore nan
+            mins[dim] = np.fmin(mins[dim] , np.fmin.reduce(d))
+            maxs[dim] = np.fmax(maxs[dim] , np.fmax.reduce(d))
+    length = maxs - mins
+
+    steps = factor ** np.arange(nb_element , dtype=float)[None,:,None]
+
+    if not density :
+        low = fixed + ( mins - fixed - length * 0.05 ) // steps
+        high = fixed + ( maxs - fixed + length * 0.05 ) // steps
+    else :
+        low , high = np.empty(fixed.shape[:1] + steps.shape[1:2] + (2,)) , np.empty(fixed.shape[:1] + steps.shape[1:2] + (2,))
+        for dim , d in enumerate((x , y)) :
+            #evenly spaced sample of the data with the bounds
+            sample = d[:: max(1 , -(-len(d) // sample_size))]
+            sample = np.sort(np.concatenate((sample[~np.isnan(sample)] , [mins[dim] , maxs[dim]])))
 
-    xmax , ymax = max (x) , max(y)
-    xmin , ymin = min (x) , min(y)
-    lengthx , lengthy = xmax - xmin , ymax - ymin
+            #fraction of points before the fixed point, then the fraction of points to keep on each side at each step
+            before = np.searchsorted(sample , fixed[:,:,dim]) / len(sample)
+            low[:,:,dim] = np.quantile(sample , before - before / steps[:,:,0])
+            high[:,:,dim] = np.quantile(sample , before + ( 1 - before ) / steps[:,:,0])
 
-    return [( fixed_point[0] +  ( xmin - fixed_point[0] - lengthx *0.05 ) // (factor**i) ,
-            fixed_point[1] + ( ymin - fixed_point[1] - lengthy * 0.05 ) // (factor**i) , 
-            fixed_point[0] + ( xmax - fixed_point[0] + lengthx *0.05 ) // (factor**i) ,
-            fixed_point[1] + ( ymax - fixed_point[1] + lengthy * 0.05 ) // (factor**i)) 
-            for i in range(nb_element)]
+        margin = ( high - low ) * 0.05
+        low , high = low - margin , high + margin
+
+    scales = np.concatenate((low , high) , axis = -1)
+    return scales[0] if points.ndim == 1 else scales
 
 
 class fixed_zoom (event_handler) :
     """
     zoom along the limit given by scales when scrolling.
+    The image of the axis for each scale can be kept in a cache so that going back to a scale only copies the image instead of redrawing the figure.
     """
     
-    def __init__(self , scales , ax = None , fig = None) :
+    def __init__(self , scales , ax = None , fig = None , cache_size = 0) :
         """
         scales : the values with which to delimite the axis. format : list where each element is (x0,y0,x1,y1).
+        cache_size : maximal number of scales whose image is kept, the least recently used are removed first. 0 to not use the cache.
+            The images are saved the first time a scale is drawn or with prerender, and are removed when the figure is resized
+            or when an artist of the axis is added, removed, shown, hidden or given new data (set_data, set_offsets, set_array ...).
+            Call invalidate after modifying the data of an artist in place or changing the graph in another way.
         """
         super().__init__(ax,fig)
 
@@ -190,7 +263,17 @@ class fixed_zoom (event_handler) :
         self.len = len(scales)
         self.i = 0
 
+        self.cache_size = cache_size
+        #index of the scale : image of the area of the axis, all saved on the same area self.region
+        self.cache = OrderedDict()
+        self.region = None
+        self.cache_key = None
+        self.is_restoring = False
+
         self.event_action = [('scroll_event',self.zoom)]
+        if cache_size :
+            self.event_action += [('draw_event',self.save_scale),
+                                  ('resize_event',self.invalidate)]
     
     def zoom (self , event):
         #get the new position of the limits on the list.
@@ -211,7 +294,183 @@ class fixed_zoom (event_handler) :
         self.ax.set_xlim (s[0] , s[2] )
         self.ax.set_ylim (s[1] , s[3] )       
         
-        plt.draw()
+        if not self.restore_scale() :
+            self.redraw()
+
+    def get_cache_key ( self ) :
+        """
+        return what the saved images depend on : the size of the figure, and the visibility and data of the artists of the axis.
+        The objects holding the data of an artist are replaced when new data is set, so they are compared by identity.
+        """
+        key = [ self.fig.canvas.get_width_height() , self.fig.dpi ]
+        for artist in self.ax.get_children() :
+            #animated artists are not in the saved images
+            if artist.get_animated() :
+                continue
+            key += [ artist , artist.get_visible() ]
+            if isinstance(artist , Line2D) :
+                key += [ artist.get_xdata(orig=True) , artist.get_ydata(orig=True) ]
+            if isinstance(artist , Collection) :
+                key += [ artist.get_offsets() , artist.get_paths() ]
+            if isinstance(artist , ScalarMappable) :
+                key.append(artist.get_array())
+            if isinstance(artist , Text) :
+                key.append(artist.get_text())
+        return key
+
+    def is_cache_key ( self , key ) :
+        #compare the data objects by identity and the other values by equality
+        return self.cache_key is not None and len(key) == len(self.cache_key) and all(
+            a is b or ( isinstance(a , (tuple , float , int , str)) and a == b )
+            for a , b in zip(key , self.cache_key) )
+
+    def invalidate ( self , event = None ) :
+        """
+        remove all the saved images.
+        """
+        self.cache.clear()
+        self.region = None
+        self.cache_key = None
+
+    def is_current_scale ( self ) :
+        s = self.scales[self.i]
+        return np.allclose(self.ax.get_xlim() , (s[0] , s[2])) and np.allclose(self.ax.get_ylim() , (s[1] , s[3]))
+
+    def compute_region ( self ) :
+        """
+        compute the area saved for every scale : the union of the area of the axis with its ticks and labels at each scale.
+        """
+        renderer = self.fig.canvas.get_renderer()
+        limit = (self.ax.get_xlim() , self.ax.get_ylim())
+        autoscale = (self.ax.get_autoscalex_on() , self.ax.get_autoscaley_on())
+
+        bboxes = []
+        for s in self.scales :
+            self.ax.set_xlim (s[0] , s[2] )
+            self.ax.set_ylim (s[1] , s[3] )
+            bboxes.append(self.ax.get_tightbbox(renderer))
+
+        self.ax.set_xlim (*limit[0] )
+        self.ax.set_ylim (*limit[1] )
+        self.ax.set_autoscalex_on(autoscale[0])
+        self.ax.set_autoscaley_on(autoscale[1])
+        self.region = Bbox.intersection(Bbox.union(bboxes) , self.fig.bbox)
+
+    def save_scale ( self , event ) :
+        #after a full draw, save the image of the axis if it shows one of the scales
+        if self.is_restoring or not self.fig.canvas.supports_blit or not self.is_current_scale() :
+            return
+
+        key = self.get_cache_key()
+        if not self.is_cache_key(key) :
+            self.invalidate()
+            self.cache_key = key
+        if self.region is None :
+            self.compute_region()
+
+        self.cache[self.i] = self.fig.canvas.copy_from_bbox(self.region)
+        self.cache.move_to_end(self.i)
+        while len(self.cache) > self.cache_size :
+            self.cache.popitem(last = False)
+
+    def restore_scale ( self ) :
+        """
+        copy the saved image of the current scale on the figure. Return False if there is no valid image.
+        """
+        if self.i not in self.cache or not self.is_cache_key(self.get_cache_key()) :
+            return False
+        self.cache.move_to_end(self.i)
+        self.fig.canvas.restore_region(self.cache[self.i])
+        self.fig.canvas.blit(self.region)
+
+        #the figure changed without a draw, tell the other handlers saving a background (get_value_scatter ...) to save it again
+        self.is_restoring = True
+        self.fig.canvas.callbacks.process('draw_event' ,
+            DrawEvent('draw_event' , self.fig.canvas , self.fig.canvas.get_renderer()))
+        self.is_restoring = False
+        return True
+
+    def prerender ( self ) :
+        """
+        draw the scales nearest to the current one to save their image in advance. Better called before showing the figure.
+        """
+        if not self.cache_size :
+            return
+        current , limit = self.i , (self.ax.get_xlim() , self.ax.get_ylim())
+        nearest = sorted(range(self.len) , key = lambda i : abs(i - current))[:self.cache_size]
+        #the nearest scales are drawn last so that they are the last removed from the cache
+        for i in nearest[::-1] :
+            self.i = i
+            s = self.scales[i]
+            self.ax.set_xlim (s[0] , s[2] )
+            self.ax.set_ylim (s[1] , s[3] )
+            self.redraw(now = True)
+            self.save_scale(None)
+
+        self.i = current
+        self.ax.set_xlim (*limit[0] )
+        self.ax.set_ylim (*limit[1] )
+        self.redraw()
+
+
+#figure of a worker of export_views, created once by export_worker_init.
+export_worker_state = {}
+
+def export_worker_init ( figure_factory , dpi ) :
+    #create the figure of the worker on the Agg backend
+    matplotlib.use('Agg' , force = True)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig , ax = figure_factory()
+    FigureCanvasAgg(fig)
+    if dpi is not None :
+        fig.set_dpi(dpi)
+    export_worker_state.update(fig = fig , ax = ax)
+
+def export_worker_frame ( i , view , filename ) :
+    #render one view, save it if filename is given otherwise return the RGBA buffer
+    fig , ax = export_worker_state['fig'] , export_worker_state['ax']
+    ax.set_xlim (view[0] , view[2] )
+    ax.set_ylim (view[1] , view[3] )
+
+    if filename is not None :
+        fig.savefig(filename%i , dpi = 'figure')
+        return filename%i
+
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba()).copy()
+
+def export_views ( figure_factory , views , filename = None , processes = None , dpi = None ) :
+    """
+    render the graph for each view in parallel with a pool of processes on the Agg backend, without using the GUI.
+    It is a generator : the frames are rendered while it is iterated and are given in the order of views.
+    At most 2 frames per process are rendered or waiting at the same time so that the memory stays bounded.
+
+    figure_factory : function without argument that returns (fig , ax), like plt.subplots. Called once in each process,
+        so it must be picklable (defined at the top level of a module).
+    views : list of limits where each element is (x0,y0,x1,y1), like the ones of create_gradual_scale, or a fixed_zoom.
+    filename : if given, format string of the file of each frame with the index of the frame, for example 'frame_%04d.png'.
+        The frames are saved by the processes and their filename is given.
+        If None, the frames are given as RGBA arrays of shape (height , width , 4).
+    processes : number of processes, number of CPUs if None.
+    dpi : resolution of the frames, the one of the figure if None.
+    """
+    #imported only when needed to keep the import of this module light
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    views = views.scales if isinstance(views , fixed_zoom) else views
+    processes = os.cpu_count() if processes is None else processes
+
+    with ProcessPoolExecutor( processes , mp_context = get_context('spawn') ,
+            initializer = export_worker_init , initargs = (figure_factory , dpi) ) as pool :
+        pending = deque()
+        for i , view in enumerate(views) :
+            if len(pending) >= 2 * processes :
+                yield pending.popleft().result()
+            pending.append(pool.submit(export_worker_frame , i , tuple(view) , filename))
+        while pending :
+            yield pending.popleft().result()
 
 
 class mouse_zoom (event_handler) :
@@ -230,7 +489,7 @@ class mouse_zoom (event_handler) :
         self.bound = bound
         if bound :
             #limits of the graph at the beggining
-            self.bound_limit = (ax.get_xlim() , ax.get_ylim())
+            self.bound_limit = (self.ax.get_xlim() , self.ax.get_ylim())
             #size of the graph at the beggining
             self.bound_size = (
                 self.bound_limit[0][1] - self.bound_limit[0][0] , 
@@ -302,7 +561,7 @@ class mouse_zoom (event_handler) :
         self.ax.set_xlim (new_x[0] , new_x[1] )
         self.ax.set_ylim (new_y[0] , new_y[1] )
         
-        plt.draw()
+        self.redraw()
 
 
 class get_value (event_handler) :
@@ -331,7 +590,7 @@ class get_value (event_handler) :
         #expand the figure to have some space to put the printed values
         expand_figure ('LEFT' , 2 , ax , self.fig)
 
-        ax_text = plt.axes([0.01, 0.05, 0.15, 0 ])
+        ax_text = self.fig.add_axes([0.01, 0.05, 0.15, 0 ])
         ax_text.axis('off')
         self.text = ax_text.text(0.05, 0.8, '', fontsize=10)
 
@@ -364,7 +623,7 @@ class get_value (event_handler) :
                 ) if coords else None
 
         #redraw graph
-        plt.draw()
+        self.redraw()
 
 
     def get_y ( self , data , mousex ) : 
@@ -373,47 +632,451 @@ class get_value (event_handler) :
         return y such that f(x) = y if it exists otherwise return None.
         """
         datax , datay = data
-        if mousex is None or mousex < datax[0] or mousex > datax[-1] :
+        if mousex is None or len(datax) < 2 or mousex < datax[0] or mousex > datax[-1] :
             return None
-        for i , d in enumerate(datax[1:]) :
-            if d == mousex :
-                return (mousex,datay[i])
-            elif mousex <= d :
-                lx , rx = datax[i:i+2] 
-                ly , ry = datay[i:i+2] 
-                return ( mousex , ly + ( mousex - lx ) / ( rx - lx ) * (ry - ly) )
+        #binary search of the segment containing mousex
+        i = max(1 , int(np.searchsorted(datax , mousex)))
+        lx , rx = datax[i-1:i+1] 
+        ly , ry = datay[i-1:i+1] 
+        if rx == lx :
+            return ( mousex , ly )
+        return ( mousex , ly + ( mousex - lx ) / ( rx - lx ) * (ry - ly) )
+
+
+class stream_plot (event_handler) :
+    """
+    plot curves from a live stream of samples while keeping a constant memory use.
+    The samples of each curve are stored in a preallocated ring buffer, the curves are refreshed at a capped rate from views on the buffers.
+    Line2D copies the data it is given, so each refresh copies the kept samples once, while holding the lock so that it is a consistent snapshot.
+    The graph follows the last samples, except while the user is navigating (for example with grab_move or mouse_zoom).
+    """
+    def __init__ ( self , nb_curves = 1 , capacity = 10000 , interval = 50 , window = None , resume_delay = 2 , ax = None , fig = None ) :
+        """
+        nb_curves : number of curves to plot.
+        capacity : maximal number of samples kept for each curve, the oldest samples are dropped.
+        interval : minimal time in milliseconds between two refresh of the graph.
+        window : width along the x axis of the part of the curves to follow. If None, follow all the kept samples.
+        resume_delay : number of seconds without navigation (click or scroll on the graph) before following the samples again.
+        """
+        super().__init__(ax,fig)
+
+        self.capacity = capacity
+        self.window = window
+        self.resume_delay = resume_delay
+
+        #each buffer stores the samples twice so that the last samples are always a contiguous view, format : [[x0,x1,...],[y0,y1,...]]
+        self.buffers = [ np.full((2 , 2 * capacity) , np.nan) for _ in range(nb_curves) ]
+        #position of the next sample to write and number of samples kept for each curve
+        self.heads = [ 0 for _ in range(nb_curves) ]
+        self.counts = [ 0 for _ in range(nb_curves) ]
+        self.changed = False
+        self.lock = threading.Lock()
+
+        self.curves = [ self.ax.plot([] , [])[0] for _ in range(nb_curves) ]
+        #snapshot of the data of the curves shown, updated in place so that it can be given to get_value.
+        self.data = [ (np.empty(0) , np.empty(0)) for _ in range(nb_curves) ]
+
+        self.is_pressed = False
+        self.last_navigation = - np.inf
+
+        self.timer = self.fig.canvas.new_timer(interval = interval)
+        self.timer.add_callback(self.refresh)
+
+        self.event_action = [('button_press_event',self.navigate),
+                             ('button_release_event',self.release),
+                             ('scroll_event',self.navigate)]
+
+    def push ( self , samples , curve = 0 ) :
+        """
+        add samples to a curve. Can be called from any thread.
+        samples : one sample (x,y) or a list of samples of shape (n,2).
+        curve : index of the curve.
+        """
+        samples = np.asarray(samples , dtype=float).reshape(-1 , 2)[- self.capacity:]
+        buffer = self.buffers[curve]
+
+        with self.lock :
+            index = (self.heads[curve] + np.arange(len(samples))) % self.capacity
+            buffer[: , index] = samples.T
+            buffer[: , index + self.capacity] = samples.T
+            self.heads[curve] = (self.heads[curve] + len(samples)) % self.capacity
+            self.counts[curve] = min(self.capacity , self.counts[curve] + len(samples))
+            self.changed = True
+
+    def view ( self , curve ) :
+        """
+        return the x and y of the samples of a curve as views on its buffer, in the order they were pushed.
+        """
+        start = (self.heads[curve] - self.counts[curve]) % self.capacity
+        end = start + self.counts[curve]
+        return self.buffers[curve][0 , start:end] , self.buffers[curve][1 , start:end]
+
+    def refresh ( self ) :
+        """
+        update the curves with the last samples. Called by the timer.
+        """
+        with self.lock :
+            if not self.changed :
+                return
+            self.changed = False
+            for i , curve in enumerate(self.curves) :
+                curve.set_data(*self.view(i))
+                #the copy kept by the curve is not modified by push, so it can be read by get_value without the lock
+                self.data[i] = ( curve.get_xdata(orig=True) , curve.get_ydata(orig=True) )
+
+        if self.is_following() :
+            self.follow()
+
+        self.redraw()
+
+    def is_following ( self ) :
+        return not self.is_pressed and time.monotonic() - self.last_navigation > self.resume_delay
+
+    def follow ( self ) :
+        #set the limits around the last samples
+        data = [ d for d in self.data if len(d[0]) ]
+        if not data :
+            return
+        xmax = max( np.nanmax(x) for x , _ in data )
+        xmin = min( np.nanmin(x) for x , _ in data ) if self.window is None else xmax - self.window
+        shown = [ y[x >= xmin] for x , y in data ]
+        shown = [ y for y in shown if len(y) ]
+        if xmax <= xmin or not shown :
+            return
+        ymin , ymax = min( np.nanmin(y) for y in shown ) , max( np.nanmax(y) for y in shown )
+        margin = ( ymax - ymin ) * 0.05 if ymax > ymin else 1
+
+        self.ax.set_xlim (xmin , xmax )
+        self.ax.set_ylim (ymin - margin , ymax + margin )
+
+    def navigate ( self , event ) :
+        #stop following the samples while the user moves around the graph
+        if event.inaxes == self.ax :
+            self.last_navigation = time.monotonic()
+            if event.name == 'button_press_event' :
+                self.is_pressed = True
+
+    def release ( self , event ) :
+        if self.is_pressed :
+            self.is_pressed = False
+            self.last_navigation = time.monotonic()
+
+    #the timer is needed in addition to the events so overwrite activate and activate_on_ax
+    def activate ( self ) :
+        connections = super().activate()
+        self.timer.start()
+        return connections
+
+    def activate_on_ax ( self , ax ) :
+        super().activate_on_ax(ax)
+        self.timer.start()
+
+    def stop ( self ) :
+        """
+        stop refreshing the graph.
+        """
+        self.timer.stop()
+
+
+class kd_tree :
+    """
+    k-d tree on 2d points used to find the nearest point of a position in O(log n).
+    """
+    def __init__ ( self , points , leaf_size = 128 ) :
+        """
+        points : array of shape (n,2).
+        leaf_size : maximum number of points in a leaf, the points of a leaf are compared all at once with numpy.
+        """
+        points = np.asarray(points , dtype=float)
+        n = len(points)
+        #index[start:end] are the index of the points of a node
+        self.index = np.arange(n)
+        #for each node : (start , end , dim , split , left child , right child), dim is -1 for a leaf
+        self.nodes = []
+
+        stack = [ (0 , n , None , 0) ] if n else []
+        while stack :
+            start , end , parent , side = stack.pop()
+            node = len(self.nodes)
+            if parent is not None :
+                self.nodes[parent][4 + side] = node
+
+            if end - start <= leaf_size :
+                self.nodes.append([start , end , -1 , 0. , -1 , -1])
+                continue
+
+            #split along the widest dimension at the median
+            sub = points[self.index[start:end]]
+            dim = int(np.argmax(np.ptp(sub , axis=0)))
+            mid = (start + end) // 2
+            self.index[start:end] = self.index[start:end][np.argpartition(sub[:,dim] , mid - start)]
+            self.nodes.append([start , end , dim , points[self.index[mid] , dim] , -1 , -1])
+            stack.append((mid , end , node , 1))
+            stack.append((start , mid , node , 0))
+
+        #points sorted so that the points of a leaf are contiguous
+        self.points = points[self.index]
+
+    def query ( self , position , scale = (1,1) ) :
+        """
+        return (i , distance) where points[i] is the nearest point of position, or (None , inf) if there is no point.
+        scale : factor by which each dimension is multiplied before computing the distance.
+        """
+        position = np.asarray(position , dtype=float)
+        scale = np.asarray(scale , dtype=float)
+        best = [ None , np.inf ]
+
+        def search ( node ) :
+            start , end , dim , split , left , right = self.nodes[node]
+            if dim == -1 :
+                dist = (((self.points[start:end] - position) * scale)**2).sum(axis=1)
+                i = int(np.argmin(dist))
+                if dist[i] < best[1] :
+                    best[:] = [ start + i , dist[i] ]
+                return
+            diff = (position[dim] - split) * scale[dim]
+            near , far = (left , right) if diff < 0 else (right , left)
+            search(near)
+            #only look at the other side if it can contain a nearer point
+            if diff**2 < best[1] :
+                search(far)
+
+        if self.nodes :
+            search(0)
+        if best[0] is None :
+            return None , np.inf
+        return int(self.index[best[0]]) , float(np.sqrt(best[1]))
+
+
+class get_value_scatter (event_handler) :
+    """
+    given the points of a scatter plot, show the coordinates and metadata of the nearest point of the mouse.
+    The nearest point is found in display space with a k-d tree and the graph is updated using blitting.
+    """
+    def __init__ ( self , x , y , metadata = None , max_distance = 20 , colors = "#0000ff" , leaf_size = 128 , ax = None , fig = None) :
+        """
+        x , y : data of the points along each axis.
+        metadata : metadata[i] is printed with the coordinates of the point (x[i],y[i]). Must the same length as x if given.
+        max_distance : maximal distance in pixels between the mouse and the point to show. If None, always show the nearest point.
+        colors : color of the point and the text. default is blue.
+        leaf_size : size of the leaves of the k-d tree.
+        """
+        super().__init__(ax,fig)
+
+        self.max_distance = np.inf if max_distance is None else max_distance
+        self.leaf_size = leaf_size
+
+        #point and text are animated so that they are only drawn when blitting
+        self.point , = self.ax.plot([] , [] , 'o' , color = colors , animated = True)
+        self.text = self.ax.annotate('' , xy = (0,0) , xytext = (10,10) , textcoords = 'offset points' ,
+            color = colors , fontsize = 10 , bbox = dict(boxstyle = 'round' , fc = 'w') , animated = True)
+        self.background = None
+
+        self.set_data(x , y , metadata)
+
+        self.event_action = [('motion_notify_event',self.get_value),
+                             ('draw_event',self.save_background)]
+
+    def set_data ( self , x , y , metadata = None ) :
+        """
+        change the points and rebuild the k-d tree.
+        """
+        self.x , self.y = np.asarray(x , dtype=float) , np.asarray(y , dtype=float)
+        self.metadata = metadata
+
+        #the tree is built on the data after the scale of the axis (log ...), the rest of the transformation to display space is affine.
+        xy = self.ax.transScale.transform(np.column_stack((self.x , self.y)))
+        finite = np.isfinite(xy).all(axis=1)
+        self.index_finite = np.flatnonzero(finite)
+        self.tree = kd_tree(xy[finite] , self.leaf_size)
+
+    def get_value ( self , event ) :
+        #get the nearest point of the mouse.
+        i = None
+        if event.inaxes == self.ax :
+            #the affine transformation from scaled data to display space
+            affine = self.ax.transLimits + self.ax.transAxes
+            position = affine.inverted().transform((event.x , event.y))
+            matrix = affine.get_matrix()
+            i , dist = self.tree.query(position , (abs(matrix[0,0]) , abs(matrix[1,1])))
+            if i is not None and dist > self.max_distance :
+                i = None
+
+        if i is None :
+            self.point.set_visible(False)
+            self.text.set_visible(False)
+        else :
+            i = self.index_finite[i]
+            x , y = self.x[i] , self.y[i]
+            self.point.set_data([x] , [y])
+            self.text.xy = (x , y)
+            self.text.set_text('x : %s\ny : %s'%(x , y) +
+                ( '' if self.metadata is None else '\n' + str(self.metadata[i]) ))
+            self.point.set_visible(True)
+            self.text.set_visible(True)
+
+        self.blit()
+
+    def save_background ( self , event ) :
+        #after each full redraw, save the graph without the point to restore it when blitting
+        if self.fig.canvas.supports_blit :
+            self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+            #the point is drawn after the other handlers of draw_event so that the images they save do not contain it
+            self.timer = self.fig.canvas.new_timer(interval = 0)
+            self.timer.single_shot = True
+            self.timer.add_callback(self.blit)
+            self.timer.start()
+
+    def draw_artists ( self ) :
+        self.fig.draw_artist(self.point)
+        self.fig.draw_artist(self.text)
+
+    def blit ( self ) :
+        """
+        redraw only the point and the text over the saved background.
+        """
+        if self.background is None :
+            self.redraw()
+            return
+        self.fig.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.fig.canvas.blit(self.fig.bbox)
+
+    #draw_event is not linked to an axis, and get_value already checks the axis, so activate_on_ax does the same as activate.
+    def activate_on_ax (self , ax) :
+        self.activate()
 
 
 class choose_curve (event_handler) :
     """
-    creates button to decide which curves will be visible
+    creates button to decide which curves will be visible.
+    When there are too many curves for one column of buttons, use page_size to show them page by page with a filter on their names.
     """
-    def __init__ ( self , curves , name_curves = None , recenter = True , ax = None , fig = None) :
+    def __init__ ( self , curves , name_curves = None , recenter = True , ax = None , fig = None , page_size = None) :
         """
-        curves: list of plot.
+        curves: list of plot. Can also contain LineCollection, for example the ones created by group_curves.
         name_curves : name_curves[i] is the name of the curve curves[i]. Must the same length as curves.
         recenter : recenter the graph each time we add or remove a plot.
+        page_size : if None, all the curves are in one column of buttons. Otherwise maximum number of buttons shown at once,
+            a text box filters the names with a regex, buttons change the page and show or hide all the filtered curves at once.
         """
         super().__init__(ax,fig)
 
         self.curves = curves
-        self.name_curves = ['curve %d'%(i+1) for i in range(len(data))] \
+        self.name_curves = ['curve %d'%(i+1) for i in range(len(curves))] \
             if name_curves is None else name_curves
         self.recenter = recenter
+        self.page_size = page_size
+
+        #position of each name to avoid a linear search at each click
+        self.index_curves = { name : i for i , name in enumerate(self.name_curves) }
+        #names that match the current filter and current page
+        self.filtered = list(self.name_curves)
+        self.page = 0
+        self.check = None
+
+        #limits of each line of the axis as curve : (data of the curve , (x0,y0,x1,y1)), computed once and only updated when the data of the curve is changed
+        self.limits = {}
+        self.refresh_limits()
 
 
     def add_button ( self , ax ) :
         #extend window to have some place to write the coordinate
         expand_figure ('LEFT' , 2 , ax , self.fig)
 
-        ax_but = plt.axes([0.01, 0.05, 0.4, 0.8 ])
+        if self.page_size is None or len(self.curves) <= self.page_size :
+            self.ax_but = self.fig.add_axes([0.01, 0.05, 0.4, 0.8 ])
+        else :
+            self.ax_but = self.fig.add_axes([0.01, 0.12, 0.22, 0.78 ])
+            self.add_page_button()
         #do not show the graph of the button axis
-        ax_but.axis('off')
+        self.ax_but.axis('off')
+
+        self.draw_page()
+
+    def add_page_button ( self ) :
+        #text box used to filter the name of the curves
+        ax_filter = self.fig.add_axes([0.05, 0.92, 0.17, 0.04 ])
+        self.filter_box = TextBox(ax_filter , 'filter')
+        self.filter_box.on_submit(self.set_filter)
+
+        #buttons to change page and to show or hide all the filtered curves
+        buttons = [
+            ('<' , [0.01, 0.06, 0.05, 0.04 ] , lambda _ : self.set_page(self.page - 1)) ,
+            ('>' , [0.07, 0.06, 0.05, 0.04 ] , lambda _ : self.set_page(self.page + 1)) ,
+            ('show' , [0.01, 0.01, 0.05, 0.04 ] , lambda _ : self.set_visible_curves(self.filtered , True)) ,
+            ('hide' , [0.07, 0.01, 0.05, 0.04 ] , lambda _ : self.set_visible_curves(self.filtered , False)) ,
+        ]
+        self.page_buttons = []
+        for label , pos , action in buttons :
+            but = Button(self.fig.add_axes(pos) , label)
+            but.on_clicked(action)
+            self.page_buttons.append(but)
+
+    def draw_page ( self ) :
+        """
+        (re)create the check buttons for the names of the current page.
+        """
+        if self.check is not None :
+            self.check.disconnect_events()
+            self.ax_but.clear()
+            self.ax_but.axis('off')
+
+        if self.page_size is None :
+            names = self.filtered
+        else :
+            names = self.filtered[self.page * self.page_size : (self.page + 1) * self.page_size]
+            self.ax_but.set_title('page %d/%d'%(self.page + 1 , self.nb_page()) , fontsize=8)
 
         #add buttons
-        self.check = CheckButtons(ax_but, self.name_curves ,  [True for _ in self.curves] )
+        self.check = CheckButtons(self.ax_but, names ,
+            [self.curves[self.index_curves[name]].get_visible() for name in names] )
         #link the event handler function to the button
         self.check.on_clicked(self.on_click)
+
+    def nb_page ( self ) :
+        return max(1 , -(-len(self.filtered) // self.page_size))
+
+    def set_page ( self , page ) :
+        """
+        show the buttons of the page number page.
+        """
+        self.page = max(0 , min(self.nb_page() - 1 , page))
+        self.draw_page()
+        self.redraw()
+
+    def set_filter ( self , pattern ) :
+        """
+        only show the buttons of the curves whose name match the regex pattern.
+        """
+        self.filtered = self.match_curves(pattern)
+        self.set_page(0)
+
+    def match_curves ( self , pattern ) :
+        """
+        return the names of the curves that match the regex pattern. An invalid regex (for example while typing it) is matched as plain text.
+        """
+        try :
+            regex = re.compile(pattern)
+        except re.error :
+            regex = re.compile(re.escape(pattern))
+        return [ name for name in self.name_curves if regex.search(name) ]
+
+    def set_visible_curves ( self , names , visible ) :
+        """
+        show or hide all the curves in names, recenter and redraw only once.
+        names : list of names or regex pattern used to find the curves.
+        visible : True to show the curves, False to hide them.
+        """
+        if isinstance(names , str) :
+            names = self.match_curves(names)
+
+        for name in names :
+            self.curves[self.index_curves[name]].set_visible(visible)
+
+        if self.check is not None :
+            self.draw_page()
+        self.update_graph()
      
     #not usual activate because of the button so overwrite activate and activate_on_ax
     def activate ( self ) :
@@ -425,16 +1088,144 @@ class choose_curve (event_handler) :
 
     def on_click(self,label):
         #get the current curve
-        curve = self.curves[self.name_curves.index(label)]
+        curve = self.curves[self.index_curves[label]]
         #set it invisivle if it is visible and vice versa
         curve.set_visible(not curve.get_visible())
+        self.update_graph()
+
+    def update_graph ( self ) :
         if self.recenter :
-            # recompute the ax.dataLim
-            self.ax.relim(visible_only=True)
-            # update ax using the new dataLim
-            self.ax.autoscale()
+            # recompute the ax.dataLim as the union of the limits of the visible curves and of the other lines of the axis in data coordinates
+            managed = set(map(id , self.curves))
+            others = [ a for a in self.ax.lines + self.ax.collections + self.ax.patches + self.ax.images
+                if id(a) not in managed and a.get_visible() and not a.get_animated() ]
+            lines = [ a for a in others if isinstance(a , Line2D) and a.get_transform() == self.ax.transData ]
+
+            if len(lines) < len(others) :
+                # the limits of the other artists (axhline, scatter, patches ...) are not cached, use relim for everything
+                self.ax.relim(visible_only=True)
+                self.ax.autoscale()
+            else :
+                limits = [ self.curve_limit(curve) for curve in self.curves + lines if curve.get_visible() ]
+                limits = np.array([ l for l in limits if l is not None ])
+                if len(limits) :
+                    self.ax.dataLim.set_points(np.array([
+                        limits[:,:2].min(axis=0) , limits[:,2:].max(axis=0)
+                    ]))
+                    self.ax.ignore_existing_data_limits = False
+                    # update ax using the new dataLim
+                    self.ax.autoscale()
         #redraw graph
-        plt.draw()
+        self.redraw()
+
+    def refresh_limits ( self , curves = None ) :
+        """
+        recompute the limits of the curves. Changes done with set_data are detected automatically,
+        only needed when the data of a curve was modified in place.
+        curves : list of index of the curves to update, all the curves if None.
+        """
+        for i in range(len(self.curves)) if curves is None else curves :
+            self.limits[self.curves[i]] = ( self.curve_data(self.curves[i]) , self.compute_limit(self.curves[i]) )
+
+    def curve_limit ( self , curve ) :
+        """
+        return the limits (x0,y0,x1,y1) of a curve or a line of the axis, or None if it has no finite data.
+        """
+        data = self.curve_data(curve)
+        if curve not in self.limits or any( d is not c for d , c in zip(data , self.limits[curve][0]) ) :
+            self.limits[curve] = ( data , self.compute_limit(curve) )
+        return self.limits[curve][1]
+
+    @staticmethod
+    def curve_data ( curve ) :
+        #objects replaced when set_data, set_segments or set_paths is called
+        if isinstance(curve , LineCollection) :
+            return ( curve.get_paths() , )
+        return ( curve.get_xdata(orig=True) , curve.get_ydata(orig=True) )
+
+    @staticmethod
+    def compute_limit ( curve ) :
+        if isinstance(curve , LineCollection) :
+            segments = curve.get_segments()
+            xy = np.concatenate(segments) if segments else np.empty((0,2))
+        else :
+            xy = np.asarray(curve.get_xydata() , dtype=float)
+        xy = xy[np.isfinite(xy).all(axis=1)]
+        if not len(xy) :
+            return None
+        return ( *xy.min(axis=0) , *xy.max(axis=0) )
+
+
+def group_curves ( data , groups , ax = None , **kwargs ) :
+    """
+    draw curves sharing the same group as a single LineCollection, which is much faster to draw than one plot per curve.
+    Used to give choose_curve one button per group instead of one per curve.
+
+    data : data of the curves must be a list of couple of data (x,y) where the lengths of x and y are equals.
+    groups : groups[i] is the name of the group of the curve data[i]. Must the same length as data.
+    ax : the axis on which to draw.
+    kwargs : other arguments given to each LineCollection, the color of each group follows the color cycle if not given.
+
+    return the list of LineCollection and the list of the name of their groups, in order of first appearance.
+    """
+    ax , _ = get_ax_fig(ax)
+
+    segments = {}
+    for (x , y) , group in zip(data , groups) :
+        segments.setdefault(group , []).append(np.column_stack((x , y)))
+
+    collections = []
+    for i , (group , segs) in enumerate(segments.items()) :
+        args = dict(kwargs)
+        if 'color' not in args and 'colors' not in args :
+            args['color'] = 'C%d'%(i % 10)
+        collections.append(ax.add_collection(LineCollection(segs , label = group , **args)))
+
+    return collections , list(segments)
+
+
+def binned_statistic_2d ( x , y , values , bins , limit , statistic = 'mean' ) :
+    """
+    split the area limit in bins and for each bin compute a statistic of the values of the points in it.
+
+    x , y : numpy arrays of the data of each axis.
+    values : numpy array of the value of each point.
+    bins : (number of bins along x , number of bins along y).
+    limit : ((x0 , x1) , (y0 , y1)) the area to split, the points outside of it are ignored.
+    statistic : either 'sum' , 'mean' , 'min' , 'max' or 'count'.
+
+    return (stat , xedges , yedges) where stat[i,j] is the statistic of the bin between xedges[i], xedges[i+1] and yedges[j], yedges[j+1],
+    or nan if the bin is empty and statistic is 'mean' , 'min' or 'max'.
+    """
+    assert statistic in ['sum' , 'mean' , 'min' , 'max' , 'count']
+
+    nx , ny = bins
+    xedges = np.linspace(limit[0][0] , limit[0][1] , nx + 1)
+    yedges = np.linspace(limit[1][0] , limit[1][1] , ny + 1)
+
+    #index of the bin of each point, the points on the upper limit are in the last bin
+    inside = (x >= xedges[0]) & (x <= xedges[-1]) & (y >= yedges[0]) & (y <= yedges[-1])
+    ix = np.minimum(nx - 1 , ((x[inside] - xedges[0]) / (xedges[-1] - xedges[0] or 1) * nx).astype(int))
+    iy = np.minimum(ny - 1 , ((y[inside] - yedges[0]) / (yedges[-1] - yedges[0] or 1) * ny).astype(int))
+    index = ix * ny + iy
+    values = values[inside]
+
+    count = np.bincount(index , minlength = nx * ny)
+    if statistic == 'count' :
+        stat = count.astype(float)
+    elif statistic in ['sum' , 'mean'] :
+        stat = np.bincount(index , weights = values , minlength = nx * ny)
+        if statistic == 'mean' :
+            stat = stat / np.maximum(count , 1)
+    else :
+        reduce = np.minimum if statistic == 'min' else np.maximum
+        stat = np.full(nx * ny , np.inf if statistic == 'min' else -np.inf)
+        reduce.at(stat , index , values)
+
+    #an empty bin has no mean, min or max, but its count and sum are 0
+    if statistic in ['mean' , 'min' , 'max'] :
+        stat[count == 0] = np.nan
+    return stat.reshape(nx , ny) , xedges , yedges
 
 
 class hist2d_update (event_handler) :
@@ -447,12 +1238,17 @@ class hist2d_update (event_handler) :
     When redrawing only the shown part :
         without a button, the speed is average and constant.
         with a button change are the fastest but when moving or zooming out there will be part not drawn. 
+
+    Instead of the number of points, each bin can show a statistic (sum, mean, min, max, count) of a third value of the points.
     """
-    def __init__ (self , data , draw_hist , ax_button = None , hist_bins = (10,10) , redraw_whole = False, threshold = (0.8 , 1.2) , ax = None , fig = None) :
+    def __init__ (self , data , draw_hist , ax_button = None , hist_bins = (10,10) , redraw_whole = False, threshold = (0.8 , 1.2) , ax = None , fig = None ,
+            values = None , statistic = 'mean') :
         """
         data : the dataset used to draw the hist2d
         draw_hist : a function that takes as argument (x , y , ax , bins) where x and y are the data of each axis, ax is the axis on which to draw,
             and bins are the bin specification for hist2d; and it must return a drawn histogram.
+            If values is given, it instead takes as argument (statistic , xedges , yedges , ax) where statistic[i,j] is the value of
+            the bin between xedges[i], xedges[i+1] and yedges[j], yedges[j+1]; and it can be None to draw it with pcolormesh.
         ax_button : If None the update is done at every change, otherwise ax_button is the ax on which to draw the button.
         hist_bins : the bin specification for hist2d that should be visible.
         redraw_whole : True when we redraw the whole graph when zooming otherwise update at each movement (only the showed part).
@@ -461,23 +1257,29 @@ class hist2d_update (event_handler) :
               - lower than the lower threshold * the length of the graph the last time the curve was drawn
               - bigger than the upper threshold * the length of the graph the last time the curve was drawn
             Used to prevent little move from causing a whole redraw.
+        values : value of each point, values[i] is the value of the point (data[0][i] , data[1][i]). If None, the bins show the number of points.
+        statistic : how to combine the values of the points of a bin, either 'sum' , 'mean' , 'min' , 'max' or 'count'.
         """
         super().__init__(ax,fig)
 
-        self.data = list(zip(data[0] , data[1] ))
+        self.x , self.y = np.asarray(data[0]) , np.asarray(data[1])
+        self.values = None if values is None else np.asarray(values , dtype=float)
+        self.statistic = statistic
         self.draw_hist = draw_hist
         self.ax_button = ax_button
         self.hist_bins = hist_bins
 
-        self.hist2d = self.draw_hist ( 
-                [ x[0] for x in self.data ] , 
-                [ x[1] for x in self.data ] ,
-                self.ax ,
-                self.hist_bins 
+        #bounds of the whole dataset
+        self.data_limit = ((self.x.min() , self.x.max()) , (self.y.min() , self.y.max()))
+
+        self.hist2d = self.draw ( 
+                np.ones(len(self.x) , dtype=bool) ,
+                self.hist_bins ,
+                self.data_limit
                 )
         #create the colorbar for the legend
-        self.colorbar =  plt.colorbar(self.hist2d, ax=self.ax)
-        self.limit = (ax.get_xlim() , ax.get_ylim())
+        self.colorbar =  self.fig.colorbar(self.hist2d, ax=self.ax)
+        self.limit = (self.ax.get_xlim() , self.ax.get_ylim())
         #set the function to use
         self.update = self.update_zoom if redraw_whole else self.update_always
 
@@ -503,25 +1305,21 @@ class hist2d_update (event_handler) :
         if curr_limit != self.limit or self.ax_button:
             self.limit = curr_limit 
             #get the data that should be shown on the screen
-            curr_data = [
-                x for x in self.data
-                if x[0] >=self.limit[0][0] and x[0] <= self.limit[0][1]
-                and x[1] >=self.limit[1][0] and x[1] <= self.limit[1][1]
-            ]
+            shown = (self.x >= self.limit[0][0]) & (self.x <= self.limit[0][1]) & \
+                (self.y >= self.limit[1][0]) & (self.y <= self.limit[1][1])
                 
             #redraw the hist2d and colorbar
             self.colorbar.remove()
             self.hist2d.remove()
             
-            self.hist2d = self.draw_hist ( 
-                [ x[0] for x in curr_data ] , 
-                [ x[1] for x in curr_data ] ,
-                self.ax ,
-                self.hist_bins
+            self.hist2d = self.draw ( 
+                shown ,
+                self.hist_bins ,
+                self.limit
                 )
-            self.colorbar =  plt.colorbar(self.hist2d, ax=self.ax) 
+            self.colorbar =  self.fig.colorbar(self.hist2d, ax=self.ax) 
 
-            self.fig.canvas.draw()
+            self.redraw(now = True)
 
 
     def update_zoom (self,event) :
@@ -546,20 +1344,35 @@ class hist2d_update (event_handler) :
             self.colorbar.remove()
             self.hist2d.remove()
             
-            self.hist2d = self.draw_hist ( 
-                [ x[0] for x in self.data ] , 
-                [ x[1] for x in self.data ] ,
-                self.ax ,
-                ratio_tuple( self.hist_bins , ratio_bins )
+            self.hist2d = self.draw ( 
+                np.ones(len(self.x) , dtype=bool) ,
+                ratio_tuple( np.broadcast_to(self.hist_bins , 2) , ratio_bins ) ,
+                self.data_limit
                 )
-            self.colorbar =  plt.colorbar(self.hist2d, ax=self.ax)
+            self.colorbar =  self.fig.colorbar(self.hist2d, ax=self.ax)
             
             #set the good limit after redrawing 
             self.ax.set_xlim (curr_limit[0][0] , curr_limit[0][1] )
             self.ax.set_ylim (curr_limit[1][0] , curr_limit[1][1] )
 
-            self.fig.canvas.draw()
+            self.redraw(now = True)
+
 
+    def draw ( self , shown , bins , limit ) :
+        """
+        draw the hist2d of the points where shown is True.
+        bins : the bin specification for hist2d.
+        limit : ((x0 , x1) , (y0 , y1)) the area on which the bins are placed, only used with values.
+        """
+        if self.values is None :
+            return self.draw_hist ( self.x[shown] , self.y[shown] , self.ax , bins )
+
+        bins = [ max(1 , int(round(b))) for b in np.broadcast_to(bins , 2) ]
+        stat , xedges , yedges = binned_statistic_2d(
+            self.x[shown] , self.y[shown] , self.values[shown] , bins , limit , self.statistic )
+        if self.draw_hist is None :
+            return self.ax.pcolormesh( xedges , yedges , np.ma.masked_invalid(stat.T) )
+        return self.draw_hist ( stat , xedges , yedges , self.ax )
 
     def add_button ( self  ) :
         self.but = Button(self.ax_button, 'redraw', color='red', hovercolor='green')